@@ -1,7 +1,5 @@
-from pandas import DataFrame, concat
-from pandas.io.json import json_normalize
-
-import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
 
 '''
 this module defines key objects for data exploration:
@@ -12,6 +10,12 @@ this module defines key objects for data exploration:
 
 2. Pipe - an object for passing data between two Workspace instances. data is
     transfered using the memory attributes of both Workspaces.
+
+3. FanOutPipe - an object for passing data from one Workspace instance to
+    several others. data is read once and written to all destinations.
+
+pandas and numpy are imported within methods so that importing dataspace stays
+cheap for processes that never touch memory.
 '''
 
 
@@ -24,10 +28,16 @@ class Workspace(object):
     Attributes:
         memory (DataFrame|None) pandas dataframe for temporary storage
         connection (object) a statefull connection to the data source
+        identifier (str|None) memory column (field) of unique identifiers.
+            declared with index_memory()
     '''
     def __init__(self):
         self.memory = None
         self.connection = None
+        self.identifier = None
+        self._index = {}  # identifier value -> row position in memory
+        self._indexed = None  # the memory frame that _index was built for
+        self._indexed_rows = 0  # length of memory when _index was checked
 
     def to_storage(self):
         '''
@@ -51,6 +61,11 @@ class Workspace(object):
             column (str) data field name to expand or compress into
             decompress (bool) choose between column compression/decompression
         '''
+        from pandas import DataFrame, concat
+        from pandas.io.json import json_normalize
+
+        import numpy as np
+
         if decompress:
             decompressed = json_normalize(
                 self.memory[[column]].to_dict(orient='records'))
@@ -61,6 +76,169 @@ class Workspace(object):
             self.memory = DataFrame(data=np.array(compressed),
                                     columns=[column])
 
+    def index_memory(self, identifier):
+        '''
+        declare a column of unique identifiers and build a hash index on it.
+        the identifier may be declared before memory is loaded. the index is
+        rebuilt when memory is replaced, changes length, or no longer holds the
+        looked-up identifier at the indexed row. if identifiers are duplicated,
+        then the last occurrence is indexed
+
+        Args:
+            identifier (str) data field name (column) of unique identifiers
+        '''
+        self.identifier = identifier
+        if self.memory is None:
+            self._index = {}
+        else:
+            self._index = {key: position for position, key in
+                           enumerate(self.memory[identifier])}
+        self._indexed = self.memory
+        self._indexed_rows = 0 if self.memory is None else len(self.memory)
+
+    def _memory_index(self):
+        '''
+        return the hash index of memory, rebuilding it if memory was replaced
+        or rows were added or removed in place
+        '''
+        if self.identifier is None:
+            raise ValueError('declare an identifier with index_memory() first')
+        if self._indexed is not self.memory or (
+                self.memory is not None and
+                len(self.memory) != self._indexed_rows):
+            self.index_memory(self.identifier)
+        return self._index
+
+    def _memory_position(self, key):
+        '''
+        return the row position of an identifier in memory. the index is
+        rebuilt if the indexed row holds a different identifier, which means
+        memory was reordered or edited in place. identifiers that are not
+        indexed raise a KeyError without rebuilding the index
+
+        Args:
+            key (object) value of the identifier column
+        '''
+        position = self._memory_index().get(key)
+        if position is not None and \
+                self.memory[self.identifier].iat[position] != key:
+            self.index_memory(self.identifier)
+            position = self._index.get(key)
+        if position is None:
+            raise KeyError(key)
+        return position
+
+    def get_memory(self, key):
+        '''
+        look up a row of memory by its identifier
+
+        Args:
+            key (object) value of the identifier column
+
+        Returns (Series) the row of memory with the given identifier
+        '''
+        return self.memory.iloc[self._memory_position(key)]
+
+    def update_memory(self, key, values):
+        '''
+        update fields of a row of memory by its identifier. fields that are
+        not yet columns of memory are added as new columns
+
+        Args:
+            key (object) value of the identifier column
+            values (dict) new values keyed by data field name (column)
+        '''
+        position = self._memory_position(key)
+        for column, value in values.items():
+            if column not in self.memory.columns:
+                self.memory[column] = None
+            self.memory.iat[position, self.memory.columns.get_loc(column)] = \
+                value
+
+    def deduplicate_memory(self, identifier=None, keep='last', inplace=True):
+        '''
+        drop rows of memory that share an identifier
+
+        Args:
+            identifier (str|None) data field name (column) of identifiers.
+                if None then the declared identifier is used
+            keep (str) either 'first' or 'last' occurrence of an identifier
+            inplace (bool) replace memory or return the deduplicated frame
+
+        Returns (DataFrame|None) deduplicated frame if inplace is False
+        '''
+        if keep not in ('first', 'last'):
+            raise ValueError('{} is not a valid keep policy'.format(keep))
+        identifier = identifier or self.identifier
+        if identifier is None:
+            raise ValueError('declare an identifier with index_memory() first')
+        unique = self.memory.drop_duplicates(subset=identifier, keep=keep)
+        if not inplace:
+            return unique
+        if len(unique) < len(self.memory):
+            self.memory = unique.reset_index(drop=True)
+
+    def merge_memory(self, frame, keep='last'):
+        '''
+        merge new data into memory using the identifier index. rows with new
+        identifiers are appended, while rows with identifiers already in
+        memory are either overwritten (keep='last') or ignored (keep='first').
+        the index attribute of memory is reset when rows are appended. empty
+        frames leave memory unchanged
+
+        Args:
+            frame (DataFrame) new data with the declared identifier column
+            keep (str) either 'first' or 'last' occurrence of an identifier
+        '''
+        if keep not in ('first', 'last'):
+            raise ValueError('{} is not a valid keep policy'.format(keep))
+        if self.identifier is None:
+            raise ValueError('declare an identifier with index_memory() first')
+        if not len(frame):  # e.g. a query that matched no documents
+            return
+        from pandas import concat
+
+        frame = frame.drop_duplicates(subset=self.identifier, keep=keep)
+        if self.memory is None:
+            self.memory = frame.reset_index(drop=True)
+            self.index_memory(self.identifier)
+            return
+
+        index = self._memory_index()
+        existing = frame[self.identifier].map(lambda key: key in index)
+        existing = existing.values.astype(bool)
+
+        # rebuild the index if memory was reordered or edited in place
+        keys = frame[self.identifier].values[existing]
+        positions = [index[key] for key in keys]
+        if (self.memory[self.identifier].values[positions] != keys).any():
+            self.index_memory(self.identifier)
+            index = self._index
+            existing = frame[self.identifier].map(lambda key: key in index)
+            existing = existing.values.astype(bool)
+
+        # overwrite rows with known identifiers in place
+        if keep == 'last' and existing.any():
+            updates = frame.loc[existing]
+            positions = [index[key] for key in updates[self.identifier]]
+            for column in updates.columns:
+                if column not in self.memory.columns:
+                    self.memory[column] = None
+                self.memory.iloc[
+                    positions, self.memory.columns.get_loc(column)] = \
+                    updates[column].values
+
+        # append rows with new identifiers and extend the index
+        additions = frame.loc[~existing]
+        if len(additions):
+            offset = len(self.memory)
+            self.memory = concat([self.memory, additions], ignore_index=True,
+                                 sort=False)
+            for position, key in enumerate(additions[self.identifier]):
+                index[key] = offset + position
+        self._indexed = self.memory
+        self._indexed_rows = len(self.memory)
+
 
 class Pipe(object):
     '''
@@ -79,20 +257,143 @@ class Pipe(object):
         self.source = source
         self.destination = destination
 
-    def transfer(self, to='destination'):
+    def transfer(self, to='destination', transform=None):
         '''
         transfer data between memory attributes of the pipeline
 
         Args:
             to (str) either 'destination' or 'source'
+            transform (function|None) function applied to the data in transit,
+                such as a MemoizedTransform. takes and returns a DataFrame
         '''
         if to == 'destination':
-            self.destination.memory = self.source.memory
+            memory = self.source.memory
         elif to == 'source':
-            self.source.memory = self.destination.memory
+            memory = self.destination.memory
         else:
             raise ValueError('{} is not a valid transfer direction'.format(to))
 
+        if transform is not None:
+            memory = transform(memory)
+
+        if to == 'destination':
+            self.destination.memory = memory
+        else:
+            self.source.memory = memory
+
+
+class FanOutPipe(object):
+    '''
+    a fan-out pipe connects one source workspace to several destinations. the
+    source is read once and the same data is written to every destination
+    concurrently. errors are isolated to the destination that raised them.
+    local_db MongoFrames share one mongod port, so writes to local
+    destinations run one at a time
+
+    Attributes:
+        source (Workspace) instance of the data source
+        destinations (list) instances of the data destinations
+        max_workers (int|None) maximum number of concurrent writes
+        report (list) rows written, seconds spent writing and the error raised
+            (or None) for each destination during the last flow
+    '''
+    def __init__(self, source, destinations, max_workers=None):
+        '''
+        Args:
+            source (Workspace) instance of a data source
+            destinations (list) instances of data destinations. each
+                instance may only appear once, since destinations are written
+                in parallel
+            max_workers (int|None) maximum number of concurrent writes.
+                if None then all destinations are written at once
+        '''
+        self.source = source
+        self.destinations = list(destinations)
+        self.max_workers = max_workers
+        self.report = []
+
+    def transfer(self):
+        '''
+        transfer data from the memory of the source to every destination
+        '''
+        for destination in self.destinations:
+            destination.memory = self.source.memory
+
+    def flow(self, find=None, chunks=None, store=None):
+        '''
+        write data from the source to every destination concurrently. data is
+        either the memory of the source or a stream of chunks. each chunk is
+        written to all destinations before the next chunk is drawn, so a full
+        frame is never buffered. a destination that raises an error is skipped
+        for the remaining chunks and the error is reported, not raised.
+        afterwards, the memory of every destination holds the memory of the
+        source if it was written, or the memory it held before the flow if
+        chunks were streamed
+
+        Args:
+            find (dict|None) arguments to pass to source.from_storage().
+                if None then the current memory of the source is written
+            chunks (iterable|None) DataFrames to write in turn. if given, then
+                the source is not read
+            store (dict|list|None) arguments to pass to to_storage() of every
+                destination, or a list with arguments for each destination
+
+        Returns (list) rows written, seconds spent writing and the error raised
+            (or None) for each destination
+        '''
+        if store is None or isinstance(store, dict):
+            store = [store or {}] * len(self.destinations)
+        if len(store) != len(self.destinations):
+            raise ValueError('store arguments do not match the destinations')
+
+        if chunks is None:  # read the source once
+            if find is not None:
+                self.source.from_storage(**find)
+            chunks = [self.source.memory]
+            memory = [self.source.memory] * len(self.destinations)
+        else:  # destinations do not keep a partial chunk in memory
+            memory = [destination.memory for destination in self.destinations]
+
+        self.report = [{'rows': 0, 'seconds': 0., 'error': None}
+                       for _ in self.destinations]
+        max_workers = self.max_workers or max(len(self.destinations), 1)
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for chunk in chunks:
+                    healthy = [position for position, report in
+                               enumerate(self.report)
+                               if report['error'] is None]
+                    if not healthy:  # stop drawing chunks if all writes failed
+                        break
+                    list(executor.map(
+                        lambda position: self._write(
+                            position, chunk, store[position]), healthy))
+        finally:
+            for destination, frame in zip(self.destinations, memory):
+                destination.memory = frame
+
+        return self.report
+
+    def _write(self, position, chunk, store):
+        '''
+        write a chunk to one destination and record the outcome in the report
+
+        Args:
+            position (int) position of the destination
+            chunk (DataFrame) data to write
+            store (dict) arguments to pass to to_storage()
+        '''
+        destination = self.destinations[position]
+        report = self.report[position]
+        start = perf_counter()
+        try:  # errors are isolated to this destination
+            destination.memory = chunk
+            destination.to_storage(**store)
+            report['rows'] += len(chunk)
+        except Exception as e:
+            report['error'] = e
+        report['seconds'] += perf_counter() - start
+
 
 def in_batches(func):
     '''
@@ -0,0 +1,334 @@
+import sys
+import json
+import pstats
+import cProfile
+import argparse
+import importlib
+import tracemalloc
+
+from time import perf_counter
+
+from dataspace.base import FanOutPipe
+
+
+'''
+this module implements the dataspace console entry point. it runs pipelines
+that are declared in a JSON or YAML spec, for example:
+
+    workspaces:
+      api:
+        class: dataspace.workspaces.materials_api.APIFrame
+        args:
+          RetrievalSubClass:
+            import: matminer.data_retrieval.retrieve_MP.MPDataRetrieval
+      local:
+        class: dataspace.workspaces.local_db.MongoFrame
+        args: {collection: materials, database: mp}
+    pipes:
+      - name: mirror
+        source: api
+        destinations: [local]
+        from_storage: {criteria: {elements: Si}, properties: [material_id]}
+        to_storage: {identifier: material_id}
+        transform:
+          class: dataspace.memoize.MemoizedTransform
+          args:
+            func: {import: featurizers.featurize}
+            columns: [structure]
+            path: features.sqlite
+        batch_size: 1000
+
+pipes run in order. each pipe loads its source from storage once (stage
+"load"), optionally applies a transform (stage "transform") and writes to
+every destination (stage "write"). workspaces and transforms are declared with
+a class and its constructor args, or a transform may be an imported function.
+with --profile, a report of every stage is saved as JSON
+'''
+
+
+# from python 3.12, a profiler records every thread and only one profiler may
+# be active at a time. earlier profilers only record the thread enabling them
+profiles_threads = sys.version_info >= (3, 12)
+
+
+def load_spec(path):
+    '''
+    load a pipeline spec from a JSON or YAML file
+
+    Args:
+        path (str) path to a .json, .yaml or .yml file
+
+    Returns (dict) pipeline spec
+    '''
+    with open(path) as spec:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError('YAML specs require pyyaml. install it with '
+                                  '"pip install dataspace[yaml]"')
+            return yaml.safe_load(spec)
+        else:
+            return json.load(spec)
+
+
+def resolve(value):
+    '''
+    replace {"import": "module.name"} entries of a spec with imported objects
+
+    Args:
+        value (object) spec value, which may contain nested lists and dicts
+
+    Returns (object) spec value with imports resolved
+    '''
+    if isinstance(value, dict):
+        if set(value) == {'import'}:
+            module, name = value['import'].rsplit('.', 1)
+            return getattr(importlib.import_module(module), name)
+        return {key: resolve(item) for key, item in value.items()}
+    elif isinstance(value, list):
+        return [resolve(item) for item in value]
+    else:
+        return value
+
+
+def build(declaration):
+    '''
+    construct an object declared as {"class": "module.Class", "args": {...}}.
+    other declarations, such as {"import": "module.name"}, are resolved
+
+    Args:
+        declaration (dict|None) spec of the object
+
+    Returns (object) constructed or resolved object
+    '''
+    if isinstance(declaration, dict) and 'class' in declaration:
+        Class = resolve({'import': declaration['class']})
+        return Class(**resolve(declaration.get('args', {})))
+    return resolve(declaration)
+
+
+def build_workspaces(spec):
+    '''
+    construct the workspaces declared in a pipeline spec
+
+    Args:
+        spec (dict) pipeline spec
+
+    Returns (dict) workspace instances keyed by name
+    '''
+    return {name: build(declaration)
+            for name, declaration in spec.get('workspaces', {}).items()}
+
+
+def profiled(func, profiles):
+    '''
+    profile every call of a function, which may run in a worker thread. only
+    needed before python 3.12, where profilers do not record other threads
+
+    Args:
+        func (function) function to profile
+        profiles (list) cProfile.Profile of each call is appended here
+    '''
+
+    def wrapper(*args, **kwargs):
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(func, *args, **kwargs)
+        finally:
+            profiles.append(profile)
+
+    return wrapper
+
+
+def hotspots(profiles, top=10):
+    '''
+    summarize the functions with the most internal time across profiles
+
+    Args:
+        profiles (list) cProfile.Profile instances
+        top (int) number of functions to report
+
+    Returns (list) calls, internal time and cumulative time of each function
+    '''
+    profiles = [profile for profile in profiles if profile.getstats()]
+    if not profiles:
+        return []
+    stats = pstats.Stats(*profiles).stats
+    ranked = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)
+    return [{'function': '{}:{}({})'.format(*function),
+             'calls': calls, 'tottime': tottime, 'cumtime': cumtime}
+            for function, (_, calls, tottime, cumtime, _) in ranked[:top]]
+
+
+def run_stage(func, profile=False, top=10):
+    '''
+    run a pipeline stage and measure it. threads may add their profiles to the
+    list passed to the stage
+
+    Args:
+        func (function) stage operation. takes a list of thread profiles and
+            returns the number of processed rows
+        profile (bool) record peak memory and hot spots of the stage
+        top (int) number of hot spots to report
+
+    Returns (dict) wall time, rows, rows/sec and, if profiled, peak memory and
+        hot spots of the stage
+    '''
+    profiles = []
+    if profile:
+        tracemalloc.start()
+        profiles.append(cProfile.Profile())
+        profiles[0].enable()
+
+    start = perf_counter()
+    try:
+        rows = func(profiles if profile else None)
+    finally:
+        seconds = perf_counter() - start
+        if profile:
+            profiles[0].disable()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    record = {'seconds': seconds, 'rows': rows,
+              'rows_per_sec': rows / seconds if seconds else None}
+    if profile:
+        record['peak_memory'] = peak
+        record['hotspots'] = hotspots(profiles, top=top)
+    return record
+
+
+def run_pipe(spec, workspaces, profile=False, top=10):
+    '''
+    run one pipe of a pipeline spec
+
+    Args:
+        spec (dict) pipe spec with source, destination(s), from_storage,
+            to_storage, transform, batch_size and max_workers entries
+        workspaces (dict) workspace instances keyed by name
+        profile (bool) record peak memory and hot spots of each stage
+        top (int) number of hot spots to report
+
+    Returns (list) report of each stage of the pipe
+    '''
+    name = spec.get('name', spec['source'])
+    destinations = spec.get('destinations') or [spec['destination']]
+    pipe = FanOutPipe(source=workspaces[spec['source']],
+                      destinations=[workspaces[d] for d in destinations],
+                      max_workers=spec.get('max_workers'))
+    transform = build(spec.get('transform'))
+    batch_size = spec.get('batch_size')
+    stages = []
+
+    def load(profiles):  # memory may only hold the last chunk of a pipe
+        pipe.source.from_storage(**resolve(spec.get('from_storage') or {}))
+        return len(pipe.source.memory)
+
+    def transform_memory(profiles):
+        pipe.source.memory = transform(pipe.source.memory)
+        return len(pipe.source.memory)
+
+    def write(profiles):
+        frame = pipe.source.memory
+        if batch_size:
+            chunks = (frame.iloc[start:start + batch_size]
+                      for start in range(0, len(frame), batch_size))
+        else:
+            chunks = [frame]
+        writers = {}
+        if profiles is not None and not profiles_threads:  # worker threads
+            for destination in pipe.destinations:
+                writers[destination] = destination.to_storage
+                destination.to_storage = profiled(
+                    destination.to_storage, profiles)
+        try:
+            pipe.flow(chunks=chunks,
+                      store=resolve(spec.get('to_storage')))
+        finally:
+            for destination in writers:
+                del destination.to_storage
+        return len(frame)
+
+    operations = [('load', load), ('transform', transform_memory),
+                  ('write', write)]
+    for stage, operation in operations:
+        if stage == 'transform' and transform is None:
+            continue
+        record = {'pipe': name, 'stage': stage}
+        record.update(run_stage(operation, profile=profile, top=top))
+        stages.append(record)
+        print('{pipe}.{stage}: {rows} rows in {seconds:.3f} s'.format(
+            **record))
+
+    stages[-1]['destinations'] = [
+        {'workspace': destination, 'rows': report['rows'],
+         'seconds': report['seconds'],
+         'error': None if report['error'] is None else repr(report['error'])}
+        for destination, report in zip(destinations, pipe.report)]
+    return stages
+
+
+def run_pipeline(spec, profile=False, top=10):
+    '''
+    run every pipe of a pipeline spec in order. the pipeline stops after a pipe
+    fails to write to any of its destinations
+
+    Args:
+        spec (dict) pipeline spec with workspaces and pipes entries
+        profile (bool) record peak memory and hot spots of each stage
+        top (int) number of hot spots to report
+
+    Returns (dict) report of each stage ('stages') and whether every write
+        succeeded ('success')
+    '''
+    workspaces = build_workspaces(spec)
+    report = {'stages': [], 'success': True}
+    for pipe in spec.get('pipes', []):
+        stages = run_pipe(pipe, workspaces, profile=profile, top=top)
+        report['stages'].extend(stages)
+        if any(destination['error'] for destination in
+               stages[-1]['destinations']):
+            report['success'] = False
+            break
+    return report
+
+
+def main(argv=None):
+    '''
+    console entry point: dataspace SPEC [--profile REPORT] [--top N]
+
+    Args:
+        argv (list|None) command line arguments. if None then sys.argv is used
+
+    Returns (int) exit status
+    '''
+    parser = argparse.ArgumentParser(
+        prog='dataspace',
+        description='run a pipeline declared in a JSON or YAML spec')
+    parser.add_argument('spec', help='path to a .json, .yaml or .yml spec')
+    parser.add_argument('--profile', metavar='REPORT',
+                        help='save a JSON report of wall time, rows/sec, peak '
+                             'memory and hot spots of every stage')
+    parser.add_argument('--top', type=int, default=10,
+                        help='number of hot spots per stage (default: 10)')
+    args = parser.parse_args(argv)
+
+    report = run_pipeline(load_spec(args.spec), profile=bool(args.profile),
+                          top=args.top)
+    if args.profile:
+        with open(args.profile, 'w') as output:
+            json.dump(report, output, indent=2)
+
+    for stage in report['stages']:
+        for destination in stage.get('destinations', []):
+            if destination['error']:
+                print('{}.{} -> {} failed: {}'.format(
+                    stage['pipe'], stage['stage'], destination['workspace'],
+                    destination['error']), file=sys.stderr)
+
+    return 0 if report['success'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,257 @@
+import json
+import pickle
+import sqlite3
+import hashlib
+
+from functools import partial
+from contextlib import closing
+
+'''
+this module defines memoized transforms for data passed through pipes. a
+transform computes new columns from the input columns of each row of memory.
+outputs are persisted in a local sqlite database keyed by a hash of the inputs,
+so that reruns of a pipeline only compute rows that have changed
+'''
+
+
+# maximum number of keys in a single sqlite query
+query_size = 500
+
+
+def serialize_value(value):
+    '''
+    convert a value that json cannot encode into a representation of its
+    contents. numpy values are converted to python values and objects with an
+    as_dict method (such as pymatgen structures) to dicts. other objects are
+    pickled
+
+    Args:
+        value (object) value of a cell
+
+    Returns (object) json-compatible representation of the value
+    '''
+    if hasattr(value, 'tolist'):  # numpy arrays and scalars
+        return value.tolist()
+    if hasattr(value, 'as_dict'):
+        return value.as_dict()
+    return pickle.dumps(value).hex()
+
+
+def hash_rows(frame):
+    '''
+    compute a 128 bit content hash of each row of a frame. rows are serialized
+    as json with sorted keys, so embedded documents (dicts and lists) are
+    supported. hashes depend on the names, values and order of the columns,
+    not on the index of the frame
+
+    Args:
+        frame (DataFrame) data to hash
+
+    Returns (list) hexadecimal hash of each row
+    '''
+    columns = list(frame.columns)
+    return [hashlib.blake2b(
+        json.dumps([columns, row], sort_keys=True,
+                   default=serialize_value).encode(),
+        digest_size=16).hexdigest()
+        for row in frame.itertuples(index=False, name=None)]
+
+
+def transform_name(func):
+    '''
+    derive the name of a transform from its qualified name
+
+    Args:
+        func (function) function or callable instance
+
+    Returns (str) module and qualified name of the function or its class
+    '''
+    if isinstance(func, partial) or '<lambda>' in getattr(
+            func, '__qualname__', ''):
+        raise ValueError('lambdas and partials share names, so memoized '
+                         'transforms of them must be given a name')
+    if not hasattr(func, '__qualname__'):  # callable instance
+        func = type(func)
+    return '{}.{}'.format(func.__module__, func.__qualname__)
+
+
+class MemoizedTransform(object):
+    '''
+    wraps a vectorized transform with a persistent cache of its outputs. rows
+    are identified by a hash of their input columns (names and values) and only
+    rows without a cached output (misses) are passed to the transform, in
+    batches. cached outputs are versioned by the identity of the transform
+
+    Attributes:
+        func (function) vectorized transform (see __init__)
+        columns (list) input columns (fields) that outputs depend on
+        path (str) path to the sqlite database of cached outputs
+        identity (str) name and version of the transform
+        max_entries (int|None) maximum number of cached outputs in the database
+        batch_size (int|None) maximum number of rows passed to the transform
+        hits (int) number of rows with cached outputs
+        misses (int) number of rows without cached outputs, including
+            duplicates. each distinct miss is passed to the transform once
+    '''
+    def __init__(self, func, columns, path, name=None, version=None,
+                 max_entries=None, batch_size=None):
+        '''
+        Args:
+            func (function) vectorized transform. takes a DataFrame of the
+                input columns and returns a DataFrame of output columns with
+                one row for each input row, in the same order
+            columns (list) input columns (fields) that outputs depend on
+            path (str) path to the sqlite database of cached outputs
+            name (str|None) name of the transform. if None then the qualified
+                name of the function (or of the class of a callable instance)
+                is used. lambdas and partials must be named explicitly
+            version (str|None) version of the transform. change the version to
+                invalidate outputs when the transform changes
+            max_entries (int|None) maximum number of cached outputs. the least
+                recently used outputs are evicted. if None then the database
+                is not capped
+            batch_size (int|None) maximum number of rows passed to the
+                transform at once. if None then all misses are passed at once
+        '''
+        self.func = func
+        self.columns = list(columns)
+        self.path = path
+        self.identity = name or transform_name(func)
+        if version is not None:
+            self.identity += ':{}'.format(version)
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+
+        with closing(sqlite3.connect(self.path)) as connection, connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS outputs (identity TEXT, key TEXT, '
+                'value BLOB, used INTEGER, PRIMARY KEY (identity, key))')
+            connection.execute(  # usage queries would otherwise scan
+                'CREATE INDEX IF NOT EXISTS outputs_used ON outputs (used)')
+
+    def __call__(self, frame):
+        '''
+        apply the transform to a frame, computing only rows that miss the cache
+
+        Args:
+            frame (DataFrame) data with the input columns
+
+        Returns (DataFrame) copy of the frame with the output columns added
+        '''
+        from pandas import DataFrame
+
+        keys = hash_rows(frame[self.columns])
+        with closing(sqlite3.connect(self.path)) as connection, connection:
+            outputs = self._lookup(connection, keys)
+            hits = sum(key in outputs for key in keys)
+
+            # compute each distinct miss once, in batches
+            missing = [position for position, key in enumerate(keys)
+                       if key not in outputs]
+            distinct = list({keys[position]: position
+                             for position in missing}.values())
+            batch_size = self.batch_size or max(len(distinct), 1)
+            for start in range(0, len(distinct), batch_size):
+                batch = distinct[start:start + batch_size]
+                computed = self.func(frame[self.columns].iloc[batch])
+                computed = computed.to_dict(orient='records')
+                if len(computed) != len(batch):
+                    raise ValueError('transform returned {} rows for {} inputs'
+                                     .format(len(computed), len(batch)))
+                new = {keys[position]: row
+                       for position, row in zip(batch, computed)}
+                self._store(connection, new)
+                outputs.update(new)
+
+            self._evict(connection)
+
+        self.hits += hits
+        self.misses += len(missing)
+
+        result = frame.copy()
+        if keys:
+            transformed = DataFrame.from_records(
+                [outputs[key] for key in keys])
+        else:  # the transform names the output columns of an empty frame
+            transformed = self.func(frame[self.columns])
+        for column in transformed.columns:
+            result[column] = transformed[column].values
+        return result
+
+    def _lookup(self, connection, keys):
+        '''
+        load cached outputs and mark them as recently used
+
+        Args:
+            connection (Connection) sqlite connection to the cache
+            keys (list) row hashes to look up
+
+        Returns (dict) cached outputs keyed by row hash
+        '''
+        unique = list(set(keys))
+        used = self._tick(connection)
+        outputs = {}
+        for start in range(0, len(unique), query_size):
+            batch = unique[start:start + query_size]
+            marks = ','.join('?' * len(batch))
+            rows = connection.execute(
+                'SELECT key, value FROM outputs WHERE identity = ? AND key IN '
+                '({})'.format(marks), [self.identity] + batch)
+            outputs.update((key, pickle.loads(value)) for key, value in rows)
+            connection.execute(
+                'UPDATE outputs SET used = ? WHERE identity = ? AND key IN '
+                '({})'.format(marks), [used, self.identity] + batch)
+        return outputs
+
+    def _store(self, connection, outputs):
+        '''
+        save computed outputs to the cache
+
+        Args:
+            connection (Connection) sqlite connection to the cache
+            outputs (dict) computed outputs keyed by row hash
+        '''
+        used = self._tick(connection)
+        connection.executemany(
+            'INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?)',
+            [(self.identity, key, pickle.dumps(row), used)
+             for key, row in outputs.items()])
+
+    def _evict(self, connection):
+        '''
+        remove the least recently used outputs beyond max_entries. outputs
+        that were used together are removed in the order they were stored
+
+        Args:
+            connection (Connection) sqlite connection to the cache
+        '''
+        if self.max_entries is None:
+            return
+        count, = connection.execute('SELECT COUNT(*) FROM outputs').fetchone()
+        if count > self.max_entries:  # ties are evicted in insertion order
+            connection.execute(
+                'DELETE FROM outputs WHERE rowid IN (SELECT rowid FROM '
+                'outputs ORDER BY used, rowid LIMIT ?)',
+                [count - self.max_entries])
+
+    @staticmethod
+    def _tick(connection):
+        '''
+        return a usage counter that is larger than any stored in the cache
+
+        Args:
+            connection (Connection) sqlite connection to the cache
+        '''
+        used, = connection.execute(
+            'SELECT COALESCE(MAX(used), 0) FROM outputs').fetchone()
+        return used + 1
+
+    def clear(self):
+        '''
+        remove all cached outputs of this transform (identity)
+        '''
+        with closing(sqlite3.connect(self.path)) as connection, connection:
+            connection.execute(
+                'DELETE FROM outputs WHERE identity = ?', [self.identity])
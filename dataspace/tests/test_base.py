@@ -5,7 +5,7 @@ from pandas.util.testing import assert_frame_equal
 
 from pandas import DataFrame
 
-from dataspace.base import Workspace, Pipe, in_batches
+from dataspace.base import Workspace, Pipe, FanOutPipe, in_batches
 
 
 initial_frame = DataFrame(data={'col1': [1, 2], 'col2': [3, 4]})
@@ -29,6 +29,25 @@ def test_func(a):
         return True
 
 
+class RecordingWorkspace(Workspace):
+    '''
+    workspace that records the frames saved to storage
+    '''
+
+    def __init__(self, fail=False):
+        Workspace.__init__(self)
+        self.fail = fail
+        self.stored = []
+
+    def to_storage(self, **kwargs):
+        if self.fail:
+            raise IOError('storage is unavailable')
+        self.stored.append((self.memory, kwargs))
+
+    def from_storage(self):
+        self.memory = initial_frame
+
+
 class TestWorkspace(TestCase):
     '''
     test the base Workspace class
@@ -63,6 +82,101 @@ class TestWorkspace(TestCase):
         self.workspace.compress_memory(column='combined', decompress=True)
         assert_frame_equal(self.workspace.memory, final_frame)
 
+    def test_index_memory(self):
+
+        # index a copy of the initial data
+        self.workspace.memory = initial_frame.copy()
+        self.workspace.index_memory('col1')
+        self.assertEqual(self.workspace.get_memory(2)['col2'], 4)
+
+        # update an existing row and add a new field
+        self.workspace.update_memory(2, {'col2': 5, 'col3': 'new'})
+        self.assertEqual(self.workspace.get_memory(2)['col2'], 5)
+        self.assertEqual(self.workspace.get_memory(2)['col3'], 'new')
+
+        # test that in place changes to memory rebuild the index
+        self.workspace.memory.sort_values('col1', ascending=False,
+                                          inplace=True)
+        self.assertEqual(self.workspace.get_memory(1)['col2'], 3)
+        self.workspace.memory.drop(0, inplace=True)
+        self.assertRaises(KeyError, self.workspace.get_memory, 1)
+
+        # test that missing identifiers do not rebuild the index
+        index = self.workspace._index
+        self.assertRaises(KeyError, self.workspace.get_memory, 5)
+        self.assertIs(self.workspace._index, index)
+
+        # test that replacing memory rebuilds the index
+        self.workspace.memory = DataFrame(data={'col1': [7], 'col2': [8]})
+        self.assertEqual(self.workspace.get_memory(7)['col2'], 8)
+        self.assertRaises(KeyError, self.workspace.get_memory, 2)
+
+    def test_deduplicate_memory(self):
+
+        duplicated_frame = DataFrame(
+            data={'col1': [1, 2, 1], 'col2': [3, 4, 5]})
+
+        # test both keep policies without modifying memory
+        self.workspace.memory = duplicated_frame
+        first = self.workspace.deduplicate_memory(
+            identifier='col1', keep='first', inplace=False)
+        last = self.workspace.deduplicate_memory(
+            identifier='col1', keep='last', inplace=False)
+        self.assertEqual(list(first['col2']), [3, 4])
+        self.assertEqual(list(last['col2']), [4, 5])
+        self.assertIs(self.workspace.memory, duplicated_frame)
+
+        # test deduplication of memory
+        self.workspace.deduplicate_memory(identifier='col1')
+        assert_frame_equal(self.workspace.memory, DataFrame(
+            data={'col1': [2, 1], 'col2': [4, 5]}))
+
+        # test that other policies raise error message
+        self.assertRaises(ValueError, self.workspace.deduplicate_memory,
+                          'col1', 'other')
+
+        # test that an identifier is required
+        self.assertRaises(ValueError, self.workspace.deduplicate_memory)
+
+    def test_merge_memory(self):
+
+        new_frame = DataFrame(data={'col1': [2, 3], 'col2': [6, 7]})
+
+        # test that existing rows are preserved (keep='first')
+        self.workspace.memory = initial_frame.copy()
+        self.workspace.index_memory('col1')
+        self.workspace.merge_memory(new_frame, keep='first')
+        assert_frame_equal(self.workspace.memory, DataFrame(
+            data={'col1': [1, 2, 3], 'col2': [3, 4, 7]}))
+        self.assertEqual(self.workspace.get_memory(3)['col2'], 7)
+
+        # test that existing rows are overwritten (keep='last')
+        self.workspace.memory = initial_frame.copy()
+        self.workspace.merge_memory(new_frame, keep='last')
+        assert_frame_equal(self.workspace.memory, DataFrame(
+            data={'col1': [1, 2, 3], 'col2': [3, 6, 7]}))
+        self.assertEqual(self.workspace.get_memory(2)['col2'], 6)
+
+        # test merging into memory that was reordered in place
+        self.workspace.memory = initial_frame.copy()
+        self.workspace.get_memory(1)
+        self.workspace.memory.sort_values('col1', ascending=False,
+                                          inplace=True)
+        self.workspace.merge_memory(new_frame, keep='last')
+        self.assertEqual(list(self.workspace.memory['col2']), [6, 3, 7])
+
+        # test declaring an identifier and merging into empty memory
+        self.workspace = Workspace()
+        self.assertRaises(ValueError, self.workspace.merge_memory, new_frame)
+        self.workspace.index_memory('col1')
+        self.workspace.merge_memory(new_frame)
+        assert_frame_equal(self.workspace.memory, new_frame)
+        self.assertEqual(self.workspace.get_memory(3)['col2'], 7)
+
+        # test that merging frames without documents changes nothing
+        self.workspace.merge_memory(DataFrame())
+        assert_frame_equal(self.workspace.memory, new_frame)
+
 
 class TestPipe(TestCase):
     '''
@@ -93,6 +207,55 @@ class TestPipe(TestCase):
         self.assertRaises(ValueError, self.pipe.transfer, 'other')
 
 
+class TestFanOutPipe(TestCase):
+    '''
+    test the FanOutPipe class
+    '''
+
+    def setUp(self):
+        self.pipe = FanOutPipe(
+            source=RecordingWorkspace(),
+            destinations=[RecordingWorkspace(), RecordingWorkspace(fail=True),
+                          RecordingWorkspace()])
+
+    def test_transfer(self):
+
+        # load data in source and transfer to every destination
+        self.pipe.source.memory = initial_frame
+        self.pipe.transfer()
+        for destination in self.pipe.destinations:
+            assert_frame_equal(destination.memory, initial_frame)
+
+    def test_flow(self):
+
+        # read the source once and write memory to every destination
+        report = self.pipe.flow(find={}, store={'identifier': 'col1'})
+        self.assertEqual([r['rows'] for r in report], [2, 0, 2])
+        self.assertIsInstance(report[1]['error'], IOError)
+        for destination, r in zip(self.pipe.destinations[::2], report[::2]):
+            self.assertIsNone(r['error'])
+            self.assertEqual(destination.stored[0][1], {'identifier': 'col1'})
+            assert_frame_equal(destination.stored[0][0], initial_frame)
+            assert_frame_equal(destination.memory, initial_frame)
+
+    def test_flow_chunks(self):
+
+        # stream chunks with arguments for each destination
+        chunks = (initial_frame.iloc[[i]] for i in range(len(initial_frame)))
+        report = self.pipe.flow(chunks=chunks, store=[{'n': 0}, {}, {'n': 2}])
+        self.assertEqual([r['rows'] for r in report], [2, 0, 2])
+        self.assertEqual(len(self.pipe.destinations[0].stored), 2)
+        self.assertEqual(self.pipe.destinations[2].stored[1][1], {'n': 2})
+        self.assertIsNone(self.pipe.source.memory)
+
+        # test that destinations do not keep the last chunk in memory
+        for destination in self.pipe.destinations:
+            self.assertIsNone(destination.memory)
+
+        # test that mismatched store arguments raise error message
+        self.assertRaises(ValueError, self.pipe.flow, None, None, [{}])
+
+
 class TestInBatches(TestCase):
     '''
     test the in_batches function
@@ -0,0 +1,152 @@
+import json
+import unittest
+
+from os import remove
+from os.path import exists
+
+from unittest import TestCase
+
+from pandas import DataFrame
+
+from dataspace.base import Workspace
+from dataspace.cli import main, resolve, run_pipeline
+
+
+spec_path = './test_spec.json'
+report_path = './test_report.json'
+cache_path = './test_cache.sqlite'
+
+initial_frame = DataFrame(data={'col1': [1, 2, 3], 'col2': [4, 5, 6]})
+
+
+class MemoryFrame(Workspace):
+    '''
+    workspace whose storage is a class attribute keyed by name
+    '''
+
+    storage = {}
+
+    def __init__(self, name, fail=False):
+        Workspace.__init__(self)
+        self.name = name
+        self.fail = fail
+
+    def to_storage(self, append=True):
+        if self.fail:
+            raise IOError('storage is unavailable')
+        stored = self.storage.setdefault(self.name, [])
+        stored.append(self.memory)
+
+    def from_storage(self, rows=None):
+        from pandas import concat
+
+        if self.name in self.storage:
+            frame = concat(self.storage[self.name], ignore_index=True)
+        else:
+            frame = initial_frame
+        self.memory = frame.iloc[:rows]
+
+
+def double(frame):
+    '''
+    test transform that doubles every value
+    '''
+
+    return frame * 2
+
+
+# import paths of test objects, however this module was imported
+memory_frame = '{}.MemoryFrame'.format(__name__)
+transform = '{}.double'.format(__name__)
+
+test_spec = {
+    'workspaces': {
+        'source': {'class': memory_frame, 'args': {'name': 'source'}},
+        'copy': {'class': memory_frame, 'args': {'name': 'copy'}},
+        'broken': {'class': memory_frame,
+                   'args': {'name': 'broken', 'fail': True}}},
+    'pipes': [
+        {'name': 'mirror', 'source': 'source', 'destinations': ['copy'],
+         'from_storage': {}, 'to_storage': {'append': True},
+         'transform': {'import': transform},
+         'batch_size': 2}]}
+
+
+class TestCLI(TestCase):
+    '''
+    test the dataspace console entry point
+    '''
+
+    def setUp(self):
+        MemoryFrame.storage.clear()
+
+    def test_resolve(self):
+        self.assertIs(resolve({'import': transform}), double)
+        self.assertEqual(resolve([{'a': 1}]), [{'a': 1}])
+
+    def test_run_pipeline(self):
+
+        # test that the transformed data is written in batches
+        report = run_pipeline(test_spec)
+        self.assertTrue(report['success'])
+        self.assertEqual([stage['stage'] for stage in report['stages']],
+                         ['load', 'transform', 'write'])
+        written = MemoryFrame.storage['copy']
+        self.assertEqual([len(chunk) for chunk in written], [2, 1])
+        self.assertEqual(list(written[1]['col2']), [12])
+        self.assertNotIn('hotspots', report['stages'][0])
+
+    def test_chained_pipes(self):
+        spec = dict(test_spec, pipes=[
+            dict(test_spec['pipes'][0], transform=None),
+            {'name': 'chained', 'source': 'copy', 'destination': 'source'}])
+
+        # test that a pipe loads every chunk written by an earlier pipe
+        self.assertTrue(run_pipeline(spec)['success'])
+        self.assertEqual(len(MemoryFrame.storage['copy']), 2)
+        written = MemoryFrame.storage['source']
+        self.assertEqual(len(written), 1)
+        self.assertEqual(list(written[0]['col1']), [1, 2, 3])
+
+    def test_memoized_transform(self):
+        spec = dict(test_spec, pipes=[dict(test_spec['pipes'][0], transform={
+            'class': 'dataspace.memoize.MemoizedTransform',
+            'args': {'func': {'import': transform}, 'name': 'double',
+                     'columns': ['col1', 'col2'], 'path': cache_path}})])
+
+        # test that a transform can be constructed from a spec
+        self.assertTrue(run_pipeline(spec)['success'])
+        self.assertEqual(list(MemoryFrame.storage['copy'][1]['col2']), [12])
+        self.assertTrue(exists(cache_path))
+
+    def test_main(self):
+        spec = dict(test_spec, pipes=[
+            dict(test_spec['pipes'][0], destinations=['copy', 'broken']),
+            dict(test_spec['pipes'][0], name='skipped')])
+        with open(spec_path, 'w') as output:
+            json.dump(spec, output)
+
+        # test that failed writes are reported with an exit status
+        self.assertEqual(main([spec_path, '--profile', report_path]), 1)
+        with open(report_path) as output:
+            report = json.load(output)
+        self.assertFalse(report['success'])
+        self.assertEqual(len(report['stages']), 3)
+
+        # test the profile of each stage
+        for stage in report['stages']:
+            self.assertEqual(stage['rows'], 3)
+            self.assertGreater(stage['peak_memory'], 0)
+            self.assertTrue(stage['hotspots'])
+        destinations = report['stages'][-1]['destinations']
+        self.assertIsNone(destinations[0]['error'])
+        self.assertIn('storage is unavailable', destinations[1]['error'])
+
+    def tearDown(self):
+        for path in (spec_path, report_path, cache_path):
+            if exists(path):
+                remove(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
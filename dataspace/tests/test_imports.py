@@ -0,0 +1,67 @@
+import sys
+import json
+import unittest
+
+from subprocess import check_output
+
+from unittest import TestCase
+
+
+# modules that should only be imported when a workspace is used
+heavy_modules = ['pandas', 'numpy', 'pymongo', 'matminer']
+
+# dataspace modules that should be cheap to import
+light_modules = ['dataspace',
+                 'dataspace.cli',
+                 'dataspace.memoize',
+                 'dataspace.base',
+                 'dataspace.workspaces.local_db',
+                 'dataspace.workspaces.remote_db',
+                 'dataspace.workspaces.materials_api',
+                 'dataspace.workspaces.partitioned_db',
+                 'dataspace.workspaces.mongo_tools']
+
+# generous upper bound on import time (seconds) of a single light module
+import_budget = 0.5
+
+
+def import_report(module):
+    '''
+    import a module in a fresh interpreter and report what it cost
+
+    Args:
+        module (str) dotted name of the module to import
+
+    Returns (dict) import time in seconds and the heavy modules imported
+    '''
+
+    script = (
+        'import sys, json, time\n'
+        'start = time.perf_counter()\n'
+        'import {module}\n'
+        'elapsed = time.perf_counter() - start\n'
+        'heavy = [m for m in {heavy} if m in sys.modules]\n'
+        'print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))\n'
+    ).format(module=module, heavy=heavy_modules)
+
+    return json.loads(check_output([sys.executable, '-c', script]))
+
+
+class TestImports(TestCase):
+    '''
+    guard against import time regressions
+    '''
+
+    def test_heavy_imports_deferred(self):
+        for module in light_modules:
+            report = import_report(module)
+            self.assertEqual(report['heavy'], [], module)
+
+    def test_import_time(self):
+        for module in light_modules:
+            report = import_report(module)
+            self.assertLess(report['seconds'], import_budget, module)
+
+
+if __name__ == '__main__':
+    unittest.main()
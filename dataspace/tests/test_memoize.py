@@ -0,0 +1,168 @@
+import sqlite3
+import unittest
+
+from os import remove
+from os.path import exists
+from functools import partial
+from contextlib import closing
+
+from unittest import TestCase
+from pandas.util.testing import assert_frame_equal
+
+from pandas import DataFrame
+
+from dataspace.base import Workspace, Pipe
+from dataspace.memoize import MemoizedTransform, hash_rows
+
+
+test_path = './test_memoize.sqlite'
+
+initial_frame = DataFrame(data={'col1': [1, 2, 1], 'col2': [3, 4, 3]})
+
+
+def add_columns(frame):
+    '''
+    vectorized test transform that records the size of each batch
+
+    Args:
+        frame (DataFrame) data with columns col1 and col2
+
+    Returns (DataFrame) sum of the columns
+    '''
+
+    add_columns.batches.append(len(frame))
+    return DataFrame(data={'sum': (frame['col1'] + frame['col2']).values})
+
+
+class CopyColumns(object):
+    '''
+    callable test transform that copies its input columns
+    '''
+
+    def __call__(self, frame):
+        return frame.copy()
+
+
+class TestMemoizedTransform(TestCase):
+    '''
+    test the MemoizedTransform class
+    '''
+
+    def setUp(self):
+        add_columns.batches = []
+        self.transform = MemoizedTransform(
+            add_columns, columns=['col1', 'col2'], path=test_path)
+
+    def test_hash_rows(self):
+
+        # hashes depend on values but not on the index
+        hashes = hash_rows(initial_frame)
+        self.assertEqual(hashes[0], hashes[2])
+        self.assertNotEqual(hashes[0], hashes[1])
+        self.assertEqual(hash_rows(initial_frame.set_index('col2')[['col1']]),
+                         hash_rows(initial_frame[['col1']]))
+
+        # hashes depend on the names and order of the columns
+        self.assertNotEqual(
+            hash_rows(initial_frame[['col1']]),
+            hash_rows(initial_frame[['col1']].rename(columns={'col1': 'a'})))
+        self.assertNotEqual(hash_rows(initial_frame[['col1', 'col2']]),
+                            hash_rows(initial_frame[['col2', 'col1']]))
+
+        # embedded documents are hashed by value
+        documents = DataFrame(data={'doc': [{'a': 1, 'b': [2]},
+                                            {'b': [2], 'a': 1},
+                                            {'a': 1, 'b': [3]}]})
+        hashes = hash_rows(documents)
+        self.assertEqual(hashes[0], hashes[1])
+        self.assertNotEqual(hashes[0], hashes[2])
+        self.assertEqual(len(hashes[0]), 32)
+
+    def test_call(self):
+        final_frame = initial_frame.assign(sum=[4, 6, 4])
+
+        # test that duplicated rows are computed once
+        assert_frame_equal(self.transform(initial_frame), final_frame)
+        self.assertEqual(add_columns.batches, [2])
+        self.assertEqual((self.transform.hits, self.transform.misses), (0, 3))
+
+        # test that cached outputs persist between instances
+        transform = MemoizedTransform(
+            add_columns, columns=['col1', 'col2'], path=test_path)
+        assert_frame_equal(transform(initial_frame), final_frame)
+        self.assertEqual(add_columns.batches, [2])
+        self.assertEqual((transform.hits, transform.misses), (3, 0))
+
+        # test that versions do not share cached outputs
+        transform = MemoizedTransform(
+            add_columns, columns=['col1', 'col2'], path=test_path,
+            version='2', batch_size=1)
+        assert_frame_equal(transform(initial_frame), final_frame)
+        self.assertEqual(add_columns.batches, [2, 1, 1])
+
+        # test that input columns do not share cached outputs
+        transform = MemoizedTransform(
+            add_columns, columns=['col2', 'col1'], path=test_path)
+        assert_frame_equal(transform(initial_frame), final_frame)
+        self.assertEqual(add_columns.batches, [2, 1, 1, 2])
+
+        # test that an empty frame keeps the output columns
+        empty = transform(initial_frame.iloc[:0])
+        self.assertEqual(list(empty.columns), ['col1', 'col2', 'sum'])
+        self.assertEqual(len(empty), 0)
+        self.assertEqual((transform.hits, transform.misses), (0, 3))
+
+    def test_identity(self):
+
+        # test names of functions and callable instances
+        self.assertTrue(self.transform.identity.endswith('add_columns'))
+        transform = MemoizedTransform(
+            CopyColumns(), columns=['col1'], path=test_path, version='1')
+        self.assertTrue(transform.identity.endswith('CopyColumns:1'))
+
+        # test that lambdas and partials must be named
+        self.assertRaises(ValueError, MemoizedTransform, lambda frame: frame,
+                          columns=['col1'], path=test_path, version='1')
+        self.assertRaises(ValueError, MemoizedTransform,
+                          partial(add_columns), columns=['col1'],
+                          path=test_path)
+        transform = MemoizedTransform(lambda frame: frame, columns=['col1'],
+                                      path=test_path, name='identity')
+        self.assertEqual(transform.identity, 'identity')
+
+    def test_eviction(self):
+
+        # test that the database is capped
+        self.transform.max_entries = 1
+        self.transform(initial_frame)
+
+        # test that outputs stored together are evicted in insertion order
+        with closing(sqlite3.connect(test_path)) as connection:
+            stored = [key for key, in connection.execute(
+                'SELECT key FROM outputs')]
+        self.assertEqual(stored, hash_rows(initial_frame.iloc[[1]]))
+        self.transform(initial_frame.iloc[[1]])
+        self.transform(initial_frame.iloc[[0]])
+        self.assertEqual(add_columns.batches, [2, 1])
+
+        # test that clearing removes cached outputs
+        self.transform.clear()
+        self.transform(initial_frame.iloc[[1]])
+        self.assertEqual(add_columns.batches, [2, 1, 1])
+
+    def test_pipe_transfer(self):
+
+        # test transforming data in transit
+        pipe = Pipe(source=Workspace(), destination=Workspace())
+        pipe.source.memory = initial_frame
+        pipe.transfer(to='destination', transform=self.transform)
+        self.assertEqual(list(pipe.destination.memory['sum']), [4, 6, 4])
+        self.assertNotIn('sum', pipe.source.memory.columns)
+
+    def tearDown(self):
+        if exists(test_path):
+            remove(test_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
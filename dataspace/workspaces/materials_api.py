@@ -1,10 +1,9 @@
 from dataspace.base import Workspace
 
-from matminer.data_retrieval.retrieve_base import BaseDataRetrieval
-
 """Implements workspaces that handle structured data in materials databases
 that are serviced by APIs. The workspaces are essentially wrappers around
-children of the matminer BaseDataRetrieval class.
+children of the matminer BaseDataRetrieval class. matminer is imported when a
+workspace is constructed, rather than when this module is imported.
 """
 
 
@@ -20,6 +19,8 @@ class APIFrame(Workspace):
             kwargs: Optional keyword arguments used to construct an instance of
                 the RetrievalSubClass class.
         """
+        from matminer.data_retrieval.retrieve_base import BaseDataRetrieval
+
         if not issubclass(RetrievalSubClass, BaseDataRetrieval):
             raise Exception(
                 'The retriever must be an a subclass of BaseDataRetrieval!')
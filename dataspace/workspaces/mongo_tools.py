@@ -0,0 +1,119 @@
+from concurrent.futures import ThreadPoolExecutor
+
+'''
+this module implements helpers that operate on pymongo Collections. they are
+shared by the mongodb workspaces in local_db and remote_db
+'''
+
+
+def flatten_document(document, prefix=''):
+    '''
+    flatten embedded documents into dotted field names. values are returned as
+    stored, so their types are not changed (unlike pandas json_normalize)
+
+    Args:
+        document (dict) document to flatten
+        prefix (str) dotted name of the embedded document
+
+    Returns (dict) values keyed by dotted field name
+    '''
+    flattened = {}
+    for field, value in document.items():
+        name = prefix + str(field)
+        if isinstance(value, dict) and value:
+            flattened.update(flatten_document(value, prefix=name + '.'))
+        else:
+            flattened[name] = value
+    return flattened
+
+
+def is_null(value):
+    '''
+    test whether a document value is missing (None or NaN)
+
+    Args:
+        value (object) document value
+    '''
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def describe_collection(collection, sample_size=1000):
+    '''
+    summarize the fields of a collection from a server-side sample of
+    documents. embedded documents are flattened into dotted field names. types
+    are those of the stored values. cardinalities are approximate: fields that
+    are unique within the sample are assumed to be unique across the collection
+
+    Args:
+        collection (Collection) pymongo collection to describe
+        sample_size (int) number of documents to sample with $sample
+
+    Returns (dict) estimated number of documents in the collection ('count'),
+        number of sampled documents ('sampled') and a DataFrame ('fields')
+        indexed by field name with the python types, null rate and approximate
+        cardinality of each field
+    '''
+    from pandas import DataFrame
+
+    count = collection.estimated_document_count()
+    documents = list(
+        collection.aggregate([{'$sample': {'size': sample_size}}]))
+
+    # collect the values of each field that are present in the sample
+    present = {}
+    for document in documents:
+        for field, value in flatten_document(document).items():
+            values = present.setdefault(field, [])
+            if not is_null(value):
+                values.append(value)
+
+    fields = []
+    for field, values in present.items():
+        null_rate = 1. - len(values) / len(documents)
+        distinct = len(set(repr(value) for value in values))
+        if values and distinct == len(values):  # unique in sample
+            cardinality = int(round(count * (1. - null_rate)))
+        else:
+            cardinality = distinct
+        fields.append({
+            'field': field,
+            'types': sorted(set(type(value).__name__ for value in values)),
+            'null_rate': null_rate,
+            'cardinality': cardinality})
+
+    return {'count': count, 'sampled': len(documents),
+            'fields': DataFrame(
+                fields, columns=['field', 'types', 'null_rate', 'cardinality']
+            ).set_index('field')}
+
+
+def delete_identifiers(collection, field, identifiers, batch_size=1000,
+                       max_workers=4):
+    '''
+    delete the documents of a collection whose identifiers are listed. the
+    identifiers are split into batches of bounded $in queries that are deleted
+    in parallel
+
+    Args:
+        collection (Collection) pymongo collection to delete from
+        field (str) document field of the identifiers
+        identifiers (iterable) identifiers of the documents to delete
+        batch_size (int) maximum number of identifiers in a single query
+        max_workers (int) maximum number of concurrent deletes
+
+    Returns (int) number of deleted documents
+    '''
+    if hasattr(identifiers, 'tolist'):  # numpy scalars are not bson types
+        identifiers = identifiers.tolist()
+    identifiers = list(dict.fromkeys(identifiers))
+    batches = [identifiers[start:start + batch_size]
+               for start in range(0, len(identifiers), batch_size)]
+    if not batches:
+        return 0
+
+    def delete(batch):
+        return collection.delete_many({field: {'$in': batch}}).deleted_count
+
+    max_workers = min(max_workers, len(batches))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return sum(executor.map(delete, batches))
@@ -0,0 +1,160 @@
+from dataspace.base import Workspace
+
+from concurrent.futures import ThreadPoolExecutor
+
+'''
+this module implements workspaces that partition structured data across several
+databases. each partition (shard) is a workspace of its own, for example remote
+MongoFrames on different hosts or collections. rows are routed to shards by the
+hash or the range of a key column, and shards are accessed in parallel
+'''
+
+
+def canonical_key(value):
+    '''
+    represent a key value independently of the dtype of its column, so that
+    equal keys are routed to the same shard. numpy scalars are converted to
+    python scalars and integral floats to integers
+
+    Args:
+        value (object) key value
+
+    Returns (str) canonical representation of the value
+    '''
+    if hasattr(value, 'item'):  # numpy scalar
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return repr(value)
+
+
+class PartitionedFrame(Workspace):
+    '''
+    abstraction for structured data partitioned across several workspaces
+    (storage) and a pandas DataFrame (memory). writes are routed to shards by a
+    key column. reads are scattered to every shard and gathered into memory.
+    shards manage their own connections, so each shard instance may only
+    appear once. local_db MongoFrames share one mongod port, so local shards
+    are accessed one at a time rather than in parallel
+
+    Attributes:
+        shards (list) workspaces that store the partitions
+        key (str) document field (column) used to route rows to shards
+        bounds (list|None) sorted values that separate range partitions. rows
+            with bounds[i - 1] <= key < bounds[i] are routed to shard i. if
+            None then rows are routed by the hash of the key
+        max_workers (int|None) maximum number of shards accessed at once
+        connection (None) shards manage their own connections
+        memory (DataFrame|None) pandas dataframe for temporary storage
+    '''
+
+    def __init__(self, shards, key, bounds=None, max_workers=None):
+        '''
+        Args:
+            shards (list) workspaces that store the partitions
+            key (str) document field (column) used to route rows to shards
+            bounds (list|None) sorted values that separate range partitions.
+                must have one value less than the number of shards. if None
+                then rows are routed by the hash of the key
+            max_workers (int|None) maximum number of shards accessed at once.
+                if None then all shards are accessed at once
+        '''
+        if not shards:
+            raise ValueError('at least one shard is required')
+        if bounds is not None and len(bounds) != len(shards) - 1:
+            raise ValueError('{} shards require {} bounds'.format(
+                len(shards), len(shards) - 1))
+        Workspace.__init__(self)
+        self.shards = list(shards)
+        self.key = key
+        self.bounds = bounds
+        self.max_workers = max_workers
+
+    def partition(self, frame):
+        '''
+        compute the shard that each row of a frame is routed to. hashes are
+        stable across processes and independent of the dtype of the key column
+        (see canonical_key), so equal keys are always routed to the same shard
+
+        Args:
+            frame (DataFrame) data with the key column
+
+        Returns (ndarray) position of the shard of each row
+        '''
+        import numpy as np
+
+        from pandas.util import hash_pandas_object
+
+        if self.bounds is None:  # hash partitioning
+            keys = frame[self.key].map(canonical_key)
+            hashes = hash_pandas_object(keys, index=False).values
+            return (hashes % np.uint64(len(self.shards))).astype(int)
+        else:  # range partitioning
+            return np.searchsorted(self.bounds, frame[self.key].values,
+                                   side='right')
+
+    def scatter(self, operation):
+        '''
+        apply an operation to every shard in parallel. errors encountered in
+        any shard are raised after the operations on all shards have finished
+
+        Args:
+            operation (function) a function of the shard position and shard
+
+        Returns (list) result of the operation on each shard
+        '''
+        max_workers = self.max_workers or len(self.shards)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(operation, position, shard)
+                       for position, shard in enumerate(self.shards)]
+        return [future.result() for future in futures]
+
+    def to_storage(self, **store):
+        '''
+        save data in memory (DataFrame) to the storage of each shard
+
+        Args:
+            **store (dict) arguments to pass to to_storage() of every shard
+        '''
+        positions = self.partition(self.memory)
+
+        def write(position, shard):
+            shard.memory = self.memory.loc[positions == position]
+            if len(shard.memory):  # some shards may not receive any rows
+                shard.to_storage(**store)
+
+        self.scatter(write)
+
+    def from_storage(self, merge_on=None, **find):
+        '''
+        load data from the storage of every shard to memory (DataFrame)
+
+        Args:
+            merge_on (str|list|None) column(s) to merge-sort the gathered data
+                by. if None then data is ordered by shard
+            **find (dict) arguments to pass to from_storage() of every shard
+        '''
+        from pandas import concat
+
+        def read(position, shard):
+            shard.from_storage(**find)
+            return shard.memory
+
+        memory = concat(self.scatter(read), ignore_index=True, sort=False)
+        if merge_on is not None:
+            memory = memory.sort_values(
+                merge_on, kind='mergesort').reset_index(drop=True)
+        self.memory = memory
+
+    def delete_storage(self, **delete):
+        '''
+        delete documents from the storage of every shard
+
+        Args:
+            **delete (dict) arguments to pass to delete_storage() of every
+                shard
+
+        Returns (list) result of delete_storage() of each shard
+        '''
+        return self.scatter(
+            lambda position, shard: shard.delete_storage(**delete))
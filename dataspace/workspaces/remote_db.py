@@ -1,8 +1,8 @@
 from dataspace.base import Workspace
+from dataspace.workspaces.mongo_tools import describe_collection, \
+    delete_identifiers
 
-from pandas import DataFrame
-
-from pymongo import MongoClient
+from time import time
 
 '''
 this module implements workspaces that handle structured data in remote
@@ -20,6 +20,7 @@ def remote_connection(func):
     '''
 
     def wrapper(self, *args, **kwargs):
+        from pymongo import MongoClient
 
         # set-up a database connection
         self.connection = MongoClient(
@@ -65,6 +66,7 @@ class MongoFrame(Workspace):
         password (str|None) password to authenticate with
         connection (MongoClient|None) statefull connection to storage
         memory (DataFrame|None) pandas dataframe for temporary storage
+        description (dict|None) cached result of describe_storage()
     '''
 
     def __init__(self, host, port, database, collection, authSource=None,
@@ -88,9 +90,11 @@ class MongoFrame(Workspace):
         self.authSource = authSource or database
         self.username = username
         self.password = password
+        self.description = None
+        self._described = (None, 0.)  # sample size and time of description
 
     @remote_connection
-    def to_storage(self, identifier, upsert=True):
+    def to_storage(self, identifier, upsert=True, keep='last'):
         '''
         save data in memory (DataFrame) to storage (Collection)
 
@@ -98,12 +102,17 @@ class MongoFrame(Workspace):
             identifier (str|None) document field (column) of unique identifier.
                 if None then unique insertion is not enforced
             upsert (bool) insert missing documents in unique insertion mode
+            keep (str) either 'first' or 'last' occurrence of an identifier is
+                written when memory contains duplicated identifiers
         '''
+        self.description = None  # storage is about to change
 
         collection = self.connection[self.database][self.collection]
 
         if identifier:  # unique insertion mode
-            for row in self.memory.to_dict(orient='records'):
+            unique = self.deduplicate_memory(
+                identifier=identifier, keep=keep, inplace=False)
+            for row in unique.to_dict(orient='records'):
                 collection.update_one(
                     filter={identifier: row[identifier]},
                     update={'$set': row},
@@ -113,36 +122,101 @@ class MongoFrame(Workspace):
                 self.memory.to_dict(orient='records'))
 
     @remote_connection
-    def from_storage(self, **find):
+    def from_storage(self, merge=False, **find):
         '''
         load data from storage (Collection) to memory (DataFrame)
 
         args:
+            merge (bool) merge loaded documents into memory by the declared
+                identifier instead of replacing memory (see merge_memory)
             **find (dict) optional arguments to pass to pymongo.find
         '''
+        from pandas import DataFrame
 
         collection = self.connection[self.database][self.collection]
 
-        self.memory = DataFrame.from_records(
-            list(collection.find(**find)))
+        loaded = DataFrame.from_records(list(collection.find(**find)))
+        if merge:
+            self.merge_memory(loaded)
+        else:
+            self.memory = loaded
 
     @remote_connection
-    def delete_storage(self, filter={}, clear_collection=False):
+    def delete_storage(self, filter={}, clear_collection=False,
+                       identifier=None, identifiers=None, batch_size=1000):
         '''
-        delete collection documents with a pymongo query operator
+        delete collection documents with a pymongo query operator or by their
+        identifiers. identifiers are deleted in parallel batches of $in queries
 
         Args:
             filter (son) pymongo query operator passed to delete_many()
             clear_collection (bool) clear storage entirely
+            identifier (str|None) document field (column) of unique identifier.
+                if None then the identifier declared on memory is used
+            identifiers (iterable|None) identifiers of documents to delete.
+                if None and an identifier is given, then the identifiers in
+                memory are deleted
+            batch_size (int) maximum number of identifiers in a single query
+
+        Returns (int) number of deleted documents
         '''
+        self.description = None  # storage is about to change
 
         collection = self.connection[self.database][self.collection]
 
         if clear_collection:  # remove all documents
-            collection.delete_many({})
+            return collection.delete_many({}).deleted_count
+        elif identifier or identifiers is not None:  # remove by identifiers
+            identifier = identifier or self.identifier
+            if identifier is None:
+                raise ValueError('an identifier field is required to delete '
+                                 'documents by their identifiers')
+            if identifiers is None:
+                identifiers = self.memory[identifier]
+            return delete_identifiers(collection, identifier, identifiers,
+                                      batch_size=batch_size)
         elif filter:  # remove documents matching kwargs
-            collection.delete_many(filter)
+            return collection.delete_many(filter).deleted_count
         else:  # make sure collection purge is intended
             raise Exception('Do you mean to delete everything in {}.{}? If so,'
                             'then flag clear_collection as True.'.format(
                                 self.database, self.collection))
+
+    def describe_storage(self, sample_size=1000, max_age=None, refresh=False):
+        '''
+        describe the fields of storage (Collection) from a server-side sample
+        of documents, without loading the collection into memory. the result
+        is cached until this workspace writes to or deletes from storage, the
+        cache is older than max_age, or a different sample size is requested
+
+        Args:
+            sample_size (int) number of documents to sample
+            max_age (float|None) seconds a cached description remains valid.
+                if None then the cache does not expire with time
+            refresh (bool) ignore the cached description
+
+        Returns (dict) estimated number of documents ('count'), number of
+            sampled documents ('sampled') and a DataFrame ('fields') of the
+            types, null rate and approximate cardinality of each field
+        '''
+        size, described = self._described
+        expired = max_age is not None and time() - described > max_age
+        if refresh or expired or self.description is None or \
+                size != sample_size:
+            self._describe_storage(sample_size)
+        return self.description
+
+    @remote_connection
+    def _describe_storage(self, sample_size):
+        '''
+        sample storage (Collection) and cache the description
+
+        Args:
+            sample_size (int) number of documents to sample
+        '''
+
+        collection = self.connection[self.database][self.collection]
+
+        self.description = describe_collection(
+            collection, sample_size=sample_size)
+        self._described = (sample_size, time())
@@ -0,0 +1,109 @@
+import unittest
+import numpy as np
+
+from unittest import TestCase
+
+from dataspace.workspaces.mongo_tools import describe_collection, \
+    delete_identifiers
+
+
+test_documents = [{'name': 'one', 'value': 1, 'info': {'source': 'a'}},
+                  {'name': 'two', 'value': 2.0, 'info': {'source': 'a'}},
+                  {'name': 'three', 'info': {'source': 'b'}},
+                  {'name': 'four', 'value': None, 'info': {'source': 'b'}}]
+
+
+class DeleteResult(object):
+    '''
+    stand-in for a pymongo DeleteResult
+    '''
+
+    def __init__(self, deleted_count):
+        self.deleted_count = deleted_count
+
+
+class SampledCollection(object):
+    '''
+    stand-in for a pymongo Collection that supports $sample aggregation
+    '''
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.pipelines = []
+        self.filters = []
+
+    def estimated_document_count(self):
+        return 10 * len(self.documents)
+
+    def delete_many(self, filter):
+        self.filters.append(filter)
+        field, = filter
+        deleted = [document for document in self.documents
+                   if document.get(field) in filter[field]['$in']]
+        self.documents = [document for document in self.documents
+                          if document not in deleted]
+        return DeleteResult(len(deleted))
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return iter(self.documents[:pipeline[0]['$sample']['size']])
+
+
+class TestDescribeCollection(TestCase):
+    '''
+    test the describe_collection function
+    '''
+
+    def test_describe_collection(self):
+        collection = SampledCollection(test_documents)
+        description = describe_collection(collection, sample_size=4)
+        fields = description['fields']
+
+        # test that sampling happens on the server
+        self.assertEqual(collection.pipelines, [[{'$sample': {'size': 4}}]])
+        self.assertEqual(description['count'], 40)
+        self.assertEqual(description['sampled'], 4)
+
+        # test flattened fields and their types
+        self.assertEqual(sorted(fields.index),
+                         ['info.source', 'name', 'value'])
+        self.assertEqual(fields.loc['value', 'types'], ['float', 'int'])
+        self.assertEqual(fields.loc['name', 'types'], ['str'])
+
+        # test null rates and approximate cardinalities
+        self.assertEqual(fields.loc['value', 'null_rate'], 0.5)
+        self.assertEqual(fields.loc['info.source', 'cardinality'], 2)
+        self.assertEqual(fields.loc['name', 'cardinality'], 40)
+
+    def test_describe_empty_collection(self):
+        description = describe_collection(SampledCollection([]))
+        self.assertEqual(description['count'], 0)
+        self.assertTrue(description['fields'].empty)
+
+
+class TestDeleteIdentifiers(TestCase):
+    '''
+    test the delete_identifiers function
+    '''
+
+    def test_delete_identifiers(self):
+        collection = SampledCollection(list(test_documents))
+
+        # test that identifiers are deduplicated and deleted in batches
+        deleted = delete_identifiers(
+            collection, 'name', np.array(['one', 'two', 'one', 'five']),
+            batch_size=2)
+        self.assertEqual(deleted, 2)
+        self.assertEqual(len(collection.filters), 2)
+        self.assertTrue(all(len(filter['name']['$in']) <= 2
+                            for filter in collection.filters))
+        self.assertEqual([document['name'] for document in
+                          collection.documents], ['three', 'four'])
+
+        # test that no queries are made without identifiers
+        self.assertEqual(delete_identifiers(collection, 'name', []), 0)
+        self.assertEqual(len(collection.filters), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+
+from unittest import TestCase
+
+from pandas import DataFrame, concat
+from pandas.util.testing import assert_frame_equal
+
+from dataspace.base import Workspace
+from dataspace.workspaces.partitioned_db import PartitionedFrame
+
+
+test_frame = DataFrame(data={'name': ['one', 'two', 'three', 'four'],
+                             'value': [1, 2, 3, 4]})
+
+
+class ListFrame(Workspace):
+    '''
+    workspace that stores frames in a list
+    '''
+
+    def __init__(self):
+        Workspace.__init__(self)
+        self.storage = []
+
+    def to_storage(self):
+        self.storage.append(self.memory)
+
+    def from_storage(self):
+        self.memory = concat(self.storage) if self.storage else DataFrame()
+
+    def delete_storage(self, clear_collection=False):
+        if not clear_collection:
+            raise Exception('Do you mean to delete everything?')
+        self.storage = []
+
+
+class PartitionedFrameTest(TestCase):
+
+    def setUp(self):
+        self.workspace = PartitionedFrame(
+            shards=[ListFrame(), ListFrame(), ListFrame()], key='value')
+        self.workspace.memory = test_frame
+
+    def test_partition(self):
+
+        # test that hash partitions are deterministic
+        positions = self.workspace.partition(test_frame)
+        self.assertTrue((positions == self.workspace.partition(
+            test_frame.iloc[::-1])[::-1]).all())
+        self.assertTrue(((positions >= 0) & (positions < 3)).all())
+
+        # test that equal keys are routed the same way regardless of dtype
+        keys = DataFrame(data={'value': [1, 2, 3]})
+        positions = self.workspace.partition(keys)
+        for other in (keys.astype(float), keys.astype(object),
+                      DataFrame(data={'value': [1., 2., 3., None]})):
+            self.assertEqual(list(self.workspace.partition(other)[:3]),
+                             list(positions))
+
+        # test range partitions
+        self.workspace.bounds = [2, 4]
+        self.assertEqual(
+            list(self.workspace.partition(test_frame)), [0, 1, 1, 2])
+
+        # test that bounds must match the shards
+        self.assertRaises(ValueError, PartitionedFrame,
+                          shards=[ListFrame()], key='value', bounds=[1])
+
+    def test_to_storage(self):
+
+        # each row should be saved to exactly one shard
+        self.workspace.to_storage()
+        stored = [len(shard.storage[0]) if shard.storage else 0
+                  for shard in self.workspace.shards]
+        self.assertEqual(sum(stored), len(test_frame))
+
+    def test_from_storage(self):
+
+        # test gathering with a merge-sort
+        self.workspace.to_storage()
+        self.workspace.from_storage(merge_on='value')
+        assert_frame_equal(self.workspace.memory, test_frame)
+
+    def test_delete_storage(self):
+
+        # test that errors are raised after all shards are accessed
+        self.workspace.to_storage()
+        self.assertRaises(Exception, self.workspace.delete_storage)
+
+        # test removing all
+        self.workspace.delete_storage(clear_collection=True)
+        self.workspace.from_storage()
+        self.assertTrue(self.workspace.memory.empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
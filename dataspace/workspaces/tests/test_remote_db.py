@@ -99,6 +99,20 @@ class MongoFrameTest(TestCase, MongoFrame):
         self.from_storage(filter={})
         self.assertTrue(len(self.memory) == (2 * len(self.original_data)))
 
+    def test_to_storage_duplicates(self):
+
+        # should save the last occurrence of duplicated identifiers
+        self.memory = DataFrame(data={'name': ['one', 'one'], 'value': [1, 2]})
+        self.to_storage(identifier='name', keep='last')
+        self.from_storage()
+        self.assertEqual(list(self.memory['value']), [2])
+
+        # should merge loaded documents into memory by identifier
+        self.memory = DataFrame(data={'name': ['one', 'two'], 'value': [0, 3]})
+        self.index_memory('name')
+        self.from_storage(merge=True)
+        self.assertEqual(list(self.memory['value']), [2, 3])
+
     def test_delete_storage(self):
 
         # add original data to storage
@@ -110,6 +124,21 @@ class MongoFrameTest(TestCase, MongoFrame):
         self.from_storage()
         self.assertTrue(len(self.memory) == (len(self.original_data) - 1))
 
+        # test remove listed identifiers in batches
+        self.memory = self.original_data
+        self.to_storage(identifier=None)
+        self.assertEqual(self.delete_storage(
+            identifier='name', identifiers=['two', 'four'], batch_size=1), 2)
+        self.from_storage()
+        self.assertEqual(sorted(self.memory['name']),
+                         ['one', 'three', 'three'])
+
+        # test remove identifiers present in memory
+        self.memory = self.original_data.iloc[[0, 2]]
+        self.assertEqual(self.delete_storage(identifier='name'), 3)
+        self.from_storage()
+        self.assertTrue(self.memory.empty)
+
         # test protected remove all
         self.assertRaises(Exception, self.delete_storage)
 
@@ -118,6 +147,23 @@ class MongoFrameTest(TestCase, MongoFrame):
         self.from_storage()
         self.assertTrue(self.memory.empty)
 
+    def test_describe_storage(self):
+
+        # add original data to storage and describe it
+        self.to_storage(identifier=None)
+        description = self.describe_storage(sample_size=10)
+        self.assertEqual(description['count'], len(self.original_data))
+        self.assertEqual(sorted(description['fields'].index),
+                         ['_id', 'feature a', 'feature b', 'name'])
+
+        # test that the description is cached
+        self.assertIs(self.describe_storage(sample_size=10), description)
+
+        # test that writing to storage invalidates the cache
+        self.to_storage(identifier=None)
+        description = self.describe_storage(sample_size=10)
+        self.assertEqual(description['count'], 2 * len(self.original_data))
+
     @classmethod
     def tearDownClass(self):
 
@@ -9,5 +9,8 @@ setup(name='dataspace',
       author='Maxwell Dylla',
       license='MIT',
       packages=find_packages(),
+      python_requires='>=3.6',
       install_requires=['numpy', 'pandas', 'matminer', 'pymongo'],
+      extras_require={'yaml': ['pyyaml']},
+      entry_points={'console_scripts': ['dataspace=dataspace.cli:main']},
       long_description=open('readme.md').read())